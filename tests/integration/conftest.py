@@ -3,24 +3,96 @@
 
 """Fixtures for the wordpress integration tests."""
 
+import asyncio
 import configparser
+import hashlib
 import json
 import re
 import secrets
+import shutil
 from pathlib import Path
-from typing import AsyncGenerator, Dict, Optional
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 
+import kubernetes
 import pytest
 import pytest_asyncio
+import requests
+import requests.adapters
 import swiftclient
 import swiftclient.exceptions
 import swiftclient.service
+import urllib3.util
+from juju.application import Application
 from juju.controller import Controller
 from juju.model import Model
 from pytest import Config
 from pytest_operator.plugin import OpsTest
 
-from tests.integration.helper import WordpressApp
+from tests.integration.helper import (
+    ThreadLocalSession,
+    WordpressApp,
+    WordpressClient,
+    wait_for_apps_idle,
+)
+
+# Files and directories packed into the charm, used to detect if a cached charm is outdated
+_CHARM_SOURCES = (
+    "actions.yaml",
+    "charmcraft.yaml",
+    "config.yaml",
+    "lib",
+    "metadata.yaml",
+    "requirements.txt",
+    "src",
+)
+
+# Command line options required by fixtures, checked after collection for the selected tests
+_FIXTURE_REQUIRED_OPTIONS = {"openstack_environment": "--openstack-rc"}
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items: List[pytest.Item]):
+    """Assign xdist groups to the collected tests.
+
+    Tests without an explicit xdist_group mark are grouped by module, so that with
+    ``--dist=loadgroup`` the tests sharing a module deployment stay on the same worker.
+
+    Args:
+        items: collected test items.
+    """
+    for item in items:
+        if item.get_closest_marker("xdist_group") is None:
+            item.add_marker(pytest.mark.xdist_group(item.nodeid.split("::")[0]))
+
+
+def pytest_collection_finish(session: pytest.Session):
+    """Check the required command line options of the selected tests.
+
+    Checking once collection and deselection are done avoids deploying the charm before finding
+    out a test can't run, without failing on tests excluded with ``-m`` or ``-k``.
+
+    Args:
+        session: pytest session, its items are the selected tests.
+
+    Raises:
+        UsageError: if a required option of a selected test is not provided.
+    """
+    config = session.config
+    if config.getoption("collectonly"):
+        return
+    for item in session.items:
+        required_options = [
+            option
+            for fixture, option in _FIXTURE_REQUIRED_OPTIONS.items()
+            if fixture in getattr(item, "fixturenames", ())
+        ]
+        for marker in item.iter_markers(name="requires_options"):
+            required_options.extend(marker.args)
+        missing_options = [option for option in required_options if not config.getoption(option)]
+        if missing_options:
+            raise pytest.UsageError(
+                f"{', '.join(missing_options)} is required for running {item.nodeid}"
+            )
 
 
 @pytest.fixture(scope="module")
@@ -31,7 +103,39 @@ def model(ops_test: OpsTest) -> Model:
     return model
 
 
-@pytest.fixture(scope="module", name="kube_config")
+@pytest.fixture(scope="module", name="http")
+def http_fixture() -> Generator[ThreadLocalSession, None, None]:
+    """Requests sessions pooling the connections to the units across the module's tests.
+
+    Each thread gets its own session, as the tests send requests from executor threads.
+    """
+
+    def new_session() -> requests.Session:
+        """Create a keep-alive session retrying failed connections.
+
+        Returns:
+            The new session.
+        """
+        session = requests.Session()
+        session.headers["Connection"] = "keep-alive"
+        session.mount(
+            "http://",
+            requests.adapters.HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=urllib3.util.Retry(total=3, backoff_factor=0.2),
+            ),
+        )
+        return session
+
+    sessions = ThreadLocalSession(new_session)
+
+    yield sessions
+
+    sessions.close()
+
+
+@pytest.fixture(scope="session", name="kube_config")
 def kube_config_fixture(pytestconfig: Config):
     """The Kubernetes cluster configuration file."""
     kube_config = pytestconfig.getoption("--kube-config")
@@ -42,6 +146,28 @@ def kube_config_fixture(pytestconfig: Config):
     return kube_config
 
 
+@pytest.fixture(scope="session", name="kube_api_client")
+def kube_api_client_fixture(kube_config: str) -> kubernetes.client.ApiClient:
+    """The Kubernetes API client, loading the cluster configuration file only once."""
+    return kubernetes.config.new_client_from_config(config_file=kube_config)
+
+
+@pytest.fixture(scope="session", name="kube_core_client")
+def kube_core_client_fixture(
+    kube_api_client: kubernetes.client.ApiClient,
+) -> kubernetes.client.CoreV1Api:
+    """The Kubernetes core API client."""
+    return kubernetes.client.CoreV1Api(api_client=kube_api_client)
+
+
+@pytest.fixture(scope="session", name="k8s_networking_v1")
+def k8s_networking_v1_fixture(
+    kube_api_client: kubernetes.client.ApiClient,
+) -> kubernetes.client.NetworkingV1Api:
+    """The Kubernetes networking API client."""
+    return kubernetes.client.NetworkingV1Api(api_client=kube_api_client)
+
+
 @pytest_asyncio.fixture(scope="module", name="machine_controller")
 async def machine_controller_fixture() -> AsyncGenerator[Controller, None]:
     """The lxd controller."""
@@ -64,9 +190,51 @@ async def machine_model_fixture(machine_controller: Controller) -> AsyncGenerato
     await model.disconnect()
 
 
+def _charm_source_digest(charm_dir: Path) -> str:
+    """Compute a digest of the files packed into the charm.
+
+    Args:
+        charm_dir: The charm source directory.
+
+    Returns:
+        The hex SHA-256 digest of the charm source files paths and contents.
+    """
+    digest = hashlib.sha256()
+    for source in _CHARM_SOURCES:
+        source_path = charm_dir / source
+        files = (
+            sorted(
+                path
+                for path in source_path.rglob("*")
+                if path.is_file() and "__pycache__" not in path.parts
+            )
+            if source_path.is_dir()
+            else [source_path]
+        )
+        for file in files:
+            digest.update(str(file.relative_to(charm_dir)).encode())
+            digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+@pytest.fixture(scope="session", name="charm_cache_dir")
+def charm_cache_dir_fixture(pytestconfig: Config) -> Path:
+    """Directory in the pytest cache storing the built charms, keyed by their source digest.
+
+    Lets test modules, xdist workers and later test sessions reuse a charm build as long as its
+    sources are unchanged. Run pytest with ``--cache-clear`` to drop the cached charms.
+    """
+    assert pytestconfig.cache, "the pytest cacheprovider plugin is required to cache the charm"
+    return pytestconfig.cache.mkdir("charms")
+
+
 @pytest_asyncio.fixture(scope="module", name="wordpress")
 async def wordpress_fixture(
-    pytestconfig: Config, ops_test: OpsTest, model: Model, kube_config: str
+    pytestconfig: Config,
+    ops_test: OpsTest,
+    model: Model,
+    kube_core_client: kubernetes.client.CoreV1Api,
+    charm_cache_dir: Path,
 ) -> WordpressApp:
     """Prepare the wordpress charm for integration tests."""
     exit_code, _, _ = await ops_test.juju("model-config", "logging-config=<root>=INFO;unit=DEBUG")
@@ -74,7 +242,13 @@ async def wordpress_fixture(
     charm = pytestconfig.getoption("--charm-file")
     charm_dir = Path(__file__).parent.parent.parent
     if not charm:
-        charm = await ops_test.build_charm(charm_dir)
+        charm = charm_cache_dir / f"wordpress-k8s-{_charm_source_digest(charm_dir)}.charm"
+        if not charm.exists():
+            built_charm = await ops_test.build_charm(charm_dir)
+            # copy then rename so concurrent workers never deploy a partially written charm
+            partial_charm = charm.with_name(f"{charm.name}.{secrets.token_hex(4)}.partial")
+            shutil.copyfile(built_charm, partial_charm)
+            partial_charm.replace(charm)
     else:
         charm = Path(charm).absolute()
     wordpress_image = pytestconfig.getoption("--wordpress-image")
@@ -89,20 +263,134 @@ async def wordpress_fixture(
         series="focal",
     )
     await model.wait_for_idle(status="blocked", apps=[app.name], timeout=30 * 60)
-    return WordpressApp(app, ops_test=ops_test, kube_config=kube_config)
+    return WordpressApp(app, ops_test=ops_test, kube_core_client=kube_core_client)
 
 
-@pytest_asyncio.fixture(scope="module")
-async def prepare_mysql(ops_test: OpsTest, wordpress: WordpressApp, model: Model):
-    """Deploy and relate the mysql-k8s charm for integration tests."""
-    app = await model.deploy("mysql-k8s", channel="8.0/stable", trust=True)
-    await model.wait_for_idle(status="active", apps=[app.name], timeout=30 * 60)
+@pytest_asyncio.fixture(scope="module", name="wp_clients")
+async def wp_clients_fixture(wordpress: WordpressApp, prepare_mysql) -> Dict[str, WordpressClient]:
+    """Admin WordPress clients keyed by unit ip, logged in once per module."""
+    return {client.host: client for client in await wordpress.client_for_units()}
+
+
+@pytest_asyncio.fixture(name="restore_config")
+async def restore_config_fixture(wordpress: WordpressApp) -> AsyncGenerator[None, None]:
+    """Restore the wordpress charm options changed by the test and wait for the charm to settle.
+
+    Options that were left at their default are reset, the others are set back to their value.
+    """
+    original_config = await wordpress.app.get_config()
+
+    yield
+
+    current_config = await wordpress.app.get_config()
+    changed_options = [
+        name
+        for name, option in original_config.items()
+        if option.get("value") != current_config.get(name, {}).get("value")
+    ]
+    if not changed_options:
+        return
+    reset_options = [
+        name for name in changed_options if original_config[name].get("source") == "default"
+    ]
+    restored_config = {
+        name: _config_value_to_str(original_config[name]["value"])
+        for name in changed_options
+        if name not in reset_options
+    }
+    if reset_options:
+        await wordpress.app.reset_config(reset_options)
+    if restored_config:
+        await wordpress.set_config(restored_config)
+    await wordpress.wait_for_wordpress_idle(status="active")
+
+
+def _config_value_to_str(value: Any) -> str:
+    """Convert a charm option value returned by juju to the string form accepted by set_config.
+
+    Args:
+        value: Value of the charm option.
+
+    Returns:
+        The option value as a string.
+    """
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+async def _prepare_mysql(wordpress: WordpressApp) -> None:
+    """Deploy and relate the mysql-k8s charm, skipping the steps that are already done.
+
+    Args:
+        wordpress: The wordpress application to relate mysql-k8s to.
+    """
+    model = wordpress.model
+    app = model.applications.get("mysql-k8s")
+    if app is None:
+        app = await model.deploy("mysql-k8s", channel="8.0/stable", trust=True)
+        await model.wait_for_idle(status="active", apps=[app.name], timeout=30 * 60)
+    if any(
+        relation.matches(f"{wordpress.name}:database", f"{app.name}:database")
+        for relation in wordpress.app.relations
+    ):
+        return
     await model.relate(f"{wordpress.name}:database", f"{app.name}:database")
-    await model.wait_for_idle(
-        status="active", apps=[app.name, wordpress.name], timeout=40 * 60, idle_period=30
+    await wait_for_apps_idle(
+        model, [app.name, wordpress.name], status="active", timeout=40 * 60, idle_period=30
     )
 
 
+async def _deploy_with_mysql(
+    wordpress: WordpressApp,
+    charm: str,
+    relation_endpoint: str,
+    deploy_kwargs: Dict[str, Any],
+    wait_kwargs: Dict[str, Any],
+) -> Application:
+    """Deploy a charm and relate it to the wordpress charm.
+
+    The charm is deployed while mysql-k8s is deployed and related to the wordpress charm.
+
+    Args:
+        wordpress: The wordpress application to relate the charm to.
+        charm: Name of the charm to deploy.
+        relation_endpoint: Endpoint of the wordpress charm to relate the charm to.
+        deploy_kwargs: Extra keyword arguments for deploying the charm.
+        wait_kwargs: Keyword arguments for waiting for the charm to settle, also used once related
+            with the status forced to active.
+
+    Returns:
+        The deployed application.
+    """
+
+    async def deploy() -> Application:
+        """Deploy the charm and wait for it to settle.
+
+        Returns:
+            The deployed application.
+        """
+        app = await wordpress.model.deploy(charm, trust=True, **deploy_kwargs)
+        await wordpress.model.wait_for_idle(apps=[app.name], **wait_kwargs)
+        return app
+
+    app, _ = await asyncio.gather(deploy(), _prepare_mysql(wordpress))
+    await wordpress.model.relate(f"{wordpress.name}:{relation_endpoint}", app.name)
+    await wait_for_apps_idle(
+        wordpress.model, [app.name, wordpress.name], **{**wait_kwargs, "status": "active"}
+    )
+    return app
+
+
+@pytest_asyncio.fixture(scope="module")
+async def prepare_mysql(wordpress: WordpressApp):
+    """Deploy and relate the mysql-k8s charm for integration tests.
+
+    Deploying and relating are skipped if already done, to avoid a needless relation hook cycle.
+    """
+    await _prepare_mysql(wordpress)
+
+
 @pytest_asyncio.fixture(scope="module")
 async def prepare_machine_mysql(
     wordpress: WordpressApp, machine_controller: Controller, machine_model: Model, model: Model
@@ -117,16 +405,13 @@ async def prepare_machine_mysql(
     )
 
 
-@pytest.fixture(scope="module", name="openstack_environment")
+@pytest.fixture(scope="session", name="openstack_environment")
 def openstack_environment_fixture(pytestconfig: Config):
     """Parse the openstack rc style configuration file from the --openstack-rc argument.
 
-    Returns: a dictionary of environment variables and values, or None if --openstack-rc isn't
-        provided.
+    Returns: a dictionary of environment variables and values.
     """
     rc_file = pytestconfig.getoption("--openstack-rc")
-    if not rc_file:
-        raise ValueError("--openstack-rc is required to run this test")
     with open(rc_file, encoding="utf-8") as rc_fo:
         rc_file = rc_fo.read()
     rc_file = re.sub("^export ", "", rc_file, flags=re.MULTILINE)
@@ -135,9 +420,12 @@ def openstack_environment_fixture(pytestconfig: Config):
     return {k.upper(): v for k, v in openstack_conf["DEFAULT"].items()}
 
 
-@pytest.fixture(scope="module", name="swift_conn")
+@pytest.fixture(scope="session", name="swift_conn")
 def swift_conn_fixture(openstack_environment) -> Optional[swiftclient.Connection]:
-    """Create a swift connection client."""
+    """Create a swift connection client.
+
+    The client authenticates lazily on its first request and keeps the token for the session.
+    """
     return swiftclient.Connection(
         authurl=openstack_environment["OS_AUTH_URL"],
         auth_version="3",
@@ -158,24 +446,40 @@ def swift_config_fixture(
     openstack_environment: Dict[str, str],
 ) -> Dict[str, str]:
     """Create a swift config dict that can be used for wp_plugin_openstack-objectstorage_config."""
-    swift_service = swiftclient.service.SwiftService(
-        options={
-            "auth_version": "3",
-            "os_auth_url": openstack_environment["OS_AUTH_URL"],
-            "os_username": openstack_environment["OS_USERNAME"],
-            "os_password": openstack_environment["OS_PASSWORD"],
-            "os_project_name": openstack_environment["OS_PROJECT_NAME"],
-            "os_project_domain_name": openstack_environment["OS_PROJECT_DOMAIN_ID"],
-        }
-    )
     container = f"wordpress_{ops_test.model_name}"
-    # if the container exists, remove the container
-    swift_service.delete(container=container)
-    # create a swift container for our test
-    swift_conn.put_container(container)
-    # change container ACL to allow us getting an object by HTTP request without any authentication
-    # the swift server will act as a static HTTP server after this
-    swift_service.post(container=container, options={"read_acl": ".r:*,.rlistings"})
+    # the container ACL allows us getting an object by HTTP request without any authentication
+    # the swift server will act as a static HTTP server with this
+    read_acl = ".r:*,.rlistings"
+    try:
+        headers, objects = swift_conn.get_container(container, full_listing=True)
+    except swiftclient.exceptions.ClientException as exc:
+        if exc.http_status != 404:
+            raise
+        # create a swift container for our test
+        swift_conn.put_container(container, headers={"X-Container-Read": read_acl})
+    else:
+        # reuse the existing container, emptied. The objects are deleted concurrently by the
+        # swift service threads, the delete results are lazily generated, drain them to run it
+        if objects:
+            # the swift service reuses the token of the already authenticated swift connection
+            swift_service = swiftclient.service.SwiftService(
+                options={
+                    "auth_version": "3",
+                    "os_auth_url": openstack_environment["OS_AUTH_URL"],
+                    "os_username": openstack_environment["OS_USERNAME"],
+                    "os_password": openstack_environment["OS_PASSWORD"],
+                    "os_project_name": openstack_environment["OS_PROJECT_NAME"],
+                    "os_project_domain_name": openstack_environment["OS_PROJECT_DOMAIN_ID"],
+                    "os_storage_url": swift_conn.url,
+                    "os_auth_token": swift_conn.token,
+                    "object_dd_threads": 16,
+                }
+            )
+            list(
+                swift_service.delete(container=container, objects=[obj["name"] for obj in objects])
+            )
+        if headers.get("x-container-read") != read_acl:
+            swift_conn.post_container(container, headers={"X-Container-Read": read_acl})
 
     return {
         "auth-url": openstack_environment["OS_AUTH_URL"] + "/v3",
@@ -203,38 +507,77 @@ async def prepare_swift(wordpress: WordpressApp, swift_config: Dict[str, str]):
 
 
 @pytest_asyncio.fixture(scope="module")
-async def prepare_nginx_ingress(wordpress: WordpressApp, prepare_mysql):
+async def prepare_nginx_ingress(wordpress: WordpressApp):
     """Deploy and relate nginx-ingress-integrator charm for integration tests."""
-    await wordpress.model.deploy("nginx-ingress-integrator", series="focal", trust=True)
-    await wordpress.model.wait_for_idle(apps=["nginx-ingress-integrator"], timeout=30 * 60)
-    await wordpress.model.relate(f"{wordpress.name}:nginx-route", "nginx-ingress-integrator")
-    await wordpress.model.wait_for_idle(status="active")
+    await _deploy_with_mysql(
+        wordpress,
+        "nginx-ingress-integrator",
+        "nginx-route",
+        deploy_kwargs={"series": "focal"},
+        wait_kwargs={"timeout": 30 * 60},
+    )
 
 
 @pytest_asyncio.fixture(scope="module")
-async def prepare_prometheus(wordpress: WordpressApp, prepare_mysql):
+async def prepare_prometheus(wordpress: WordpressApp):
     """Deploy and relate prometheus-k8s charm for integration tests."""
-    prometheus = await wordpress.model.deploy(
-        "prometheus-k8s", channel="1.0/stable", revision=129, series="focal", trust=True
-    )
-    await wordpress.model.wait_for_idle(
-        status="active", apps=[prometheus.name], raise_on_error=False, timeout=30 * 60
-    )
-    await wordpress.model.relate(f"{wordpress.name}:metrics-endpoint", prometheus.name)
-    await wordpress.model.wait_for_idle(
-        status="active",
-        apps=[prometheus.name, wordpress.name],
-        timeout=20 * 60,
-        raise_on_error=False,
+    await _deploy_with_mysql(
+        wordpress,
+        "prometheus-k8s",
+        "metrics-endpoint",
+        deploy_kwargs={"channel": "1.0/stable", "revision": 129, "series": "focal"},
+        wait_kwargs={"status": "active", "raise_on_error": False, "timeout": 30 * 60},
     )
 
 
 @pytest_asyncio.fixture(scope="module")
-async def prepare_loki(wordpress: WordpressApp, prepare_mysql):
+async def prepare_loki(wordpress: WordpressApp):
     """Deploy and relate loki-k8s charm for integration tests."""
-    loki = await wordpress.model.deploy("loki-k8s", channel="1.0/stable", trust=True)
-    await wordpress.model.wait_for_idle(apps=[loki.name], status="active", timeout=20 * 60)
-    await wordpress.model.relate(f"{wordpress.name}:logging", loki.name)
-    await wordpress.model.wait_for_idle(
-        apps=[loki.name, wordpress.name], status="active", timeout=40 * 60
+    await _deploy_with_mysql(
+        wordpress,
+        "loki-k8s",
+        "logging",
+        deploy_kwargs={"channel": "1.0/stable"},
+        wait_kwargs={"status": "active", "timeout": 40 * 60},
     )
+
+
+@pytest_asyncio.fixture(scope="module")
+async def prepare_grafana(wordpress: WordpressApp):
+    """Deploy and relate grafana-k8s charm for integration tests."""
+    await _deploy_with_mysql(
+        wordpress,
+        "grafana-k8s",
+        "grafana-dashboard",
+        deploy_kwargs={"channel": "1.0/stable", "revision": 82, "series": "focal"},
+        wait_kwargs={"status": "active", "timeout": 30 * 60},
+    )
+
+
+@pytest_asyncio.fixture(scope="module", name="grafana_admin_password")
+async def grafana_admin_password_fixture(model: Model, prepare_grafana) -> str:
+    """The Grafana admin password, fetched once per module with the get-admin-password action."""
+    action = await model.applications["grafana-k8s"].units[0].run_action("get-admin-password")
+    await action.wait()
+    return action.results["admin-password"]
+
+
+@pytest.fixture(scope="module", name="grafana_session")
+def grafana_session_fixture(
+    grafana_admin_password: str,
+) -> Generator[requests.Session, None, None]:
+    """A pooled requests session authenticated to the Grafana API as the admin user."""
+    session = requests.Session()
+    session.auth = ("admin", grafana_admin_password)
+    session.mount(
+        "http://",
+        requests.adapters.HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=urllib3.util.Retry(total=3, backoff_factor=0.2),
+        ),
+    )
+
+    yield session
+
+    session.close()
@@ -4,6 +4,7 @@
 """Helper classes and functions for integration tests."""
 
 import asyncio
+import functools
 import html
 import inspect
 import json
@@ -11,6 +12,7 @@ import logging
 import mimetypes
 import re
 import secrets
+import threading
 import time
 from typing import (
     Any,
@@ -23,6 +25,7 @@ from typing import (
     Tuple,
     Type,
     TypedDict,
+    TypeVar,
     Union,
 )
 
@@ -36,6 +39,10 @@ from pytest_operator.plugin import OpsTest
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_JITTER = secrets.SystemRandom()
+
 
 def retry(times: int, exceptions: Tuple[Type[Exception]], interval=5):
     """Retry decorator to catch exceptions and retry.
@@ -98,32 +105,23 @@ class WordPressPost(TypedDict):
 class WordpressClient:
     """A very simple WordPress client for test purpose only."""
 
-    @classmethod
-    def run_wordpress_functionality_test(cls, host: str, admin_username: str, admin_password: str):
-        """Run standard WordPress functionality test suite.
-
-        Args:
-            host: ip address or hostname of the WordPress instance.
-            admin_username: WordPress admin user username.
-            admin_password: WordPress admin user password.
-        """
-        wp_client = cls(host=host, username=admin_username, password=admin_password, is_admin=True)
-        post_title = secrets.token_hex(16)
-        post_content = secrets.token_hex(16)
-        post = wp_client.create_post(
+    def run_functionality_test(self) -> None:
+        """Run standard WordPress functionality test suite with the logged in admin user."""
+        tokens = secrets.token_bytes(48).hex()
+        post_title, post_content, comment = tokens[:32], tokens[32:64], tokens[64:]
+        post = self.create_post(
             title=post_title,
             content=post_content,
         )
-        homepage = wp_client.get_homepage()
+        homepage = self.get_homepage()
         assert post_title in homepage, "admin user should be able to create a new post"
-        comment = secrets.token_hex(16)
         post_link = post["link"]
-        comment_link = wp_client.create_comment(
+        comment_link = self.create_comment(
             post_id=post["id"],
             post_link=post_link,
             content=comment,
         )
-        assert comment_link.startswith(post_link) and comment in wp_client.get_post(
+        assert comment_link.startswith(post_link) and comment in self.get_post(
             post_link
         ), "admin user should be able to create a comment"
 
@@ -395,7 +393,8 @@ class WordpressClient:
         """List all comments in the WordPress site.
 
         Args:
-            status: WordPress comment status, can be 'hold', 'approve', 'spam', or 'trash'.
+            status: WordPress comment status, can be 'hold', 'approve', 'spam', or 'trash', or
+                'any' to list comments of every status.
             post_id: List all comments attached to the post, None to query the entire site.
 
         Returns:
@@ -543,15 +542,82 @@ class WordpressClient:
         raise ValueError(f"User {self.username} not found")
 
 
+class ThreadLocalSession:
+    """Requests sessions built by the same factory, one per calling thread.
+
+    A requests session is not thread-safe, so calls run through gather_in_executor must not share
+    one. The session is looked up when a request is sent, not when the bound method is taken,
+    hence functools.partial(session.get, url) is safe to hand to executor threads.
+    """
+
+    def __init__(self, factory: Callable[[], requests.Session]):
+        """Initialize the ThreadLocalSession object.
+
+        Args:
+            factory: Builds the session of a thread on its first request.
+        """
+        self._factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions: List[requests.Session] = []
+
+    @property
+    def session(self) -> requests.Session:
+        """The requests session of the calling thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._factory()
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request with the session of the calling thread.
+
+        Args:
+            url: URL of the request.
+            kwargs: Keyword arguments passed to requests.Session.get.
+
+        Returns:
+            The response.
+        """
+        return self.session.get(url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a HEAD request with the session of the calling thread.
+
+        Args:
+            url: URL of the request.
+            kwargs: Keyword arguments passed to requests.Session.head.
+
+        Returns:
+            The response.
+        """
+        return self.session.head(url, **kwargs)
+
+    def close(self) -> None:
+        """Close the sessions of all threads."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+
 class WordpressApp:
     """An object represents the wordpress charm application."""
 
-    def __init__(self, app: Application, ops_test: OpsTest, kube_config: str):
+    def __init__(
+        self,
+        app: Application,
+        ops_test: OpsTest,
+        kube_core_client: kubernetes.client.CoreV1Api,
+    ):
         """Initialize the WordpressApp object."""
         self.app = app
         self.ops_test = ops_test
-        kubernetes.config.load_kube_config(config_file=kube_config)
-        self.kube_core_client = kubernetes.client.CoreV1Api()
+        self.kube_core_client = kube_core_client
+        self._default_admin_password: Optional[str] = None
 
     @property
     def model(self) -> Model:
@@ -583,12 +649,16 @@ class WordpressApp:
     async def get_default_admin_password(self) -> str:
         """Get default admin password using get-initial-password action.
 
+        The password doesn't change for a deployment, so the action only runs once.
+
         Returns:
             WordPress admin account password
         """
-        action = await self.app.units[0].run_action("get-initial-password")
-        await action.wait()
-        return action.results["password"]
+        if self._default_admin_password is None:
+            action = await self.app.units[0].run_action("get-initial-password")
+            await action.wait()
+            self._default_admin_password = action.results["password"]
+        return self._default_admin_password
 
     async def set_config(self, config):
         """Update the configuration of the wordpress charm."""
@@ -601,16 +671,21 @@ class WordpressApp:
         return yaml.safe_load(openstack_config).get("bucket")
 
     async def client_for_units(self) -> List[WordpressClient]:
-        """Get a list of WordpressClient for each unit of the wordpress application."""
-        clients = []
+        """Get a list of WordpressClient for each unit of the wordpress application.
+
+        The clients log in to their units concurrently.
+        """
         default_admin_password = await self.get_default_admin_password()
-        for unit_ip in await self.get_unit_ips():
-            clients.append(
-                WordpressClient(
-                    host=unit_ip, username="admin", password=default_admin_password, is_admin=True
-                )
+        return await gather_in_executor(
+            functools.partial(
+                WordpressClient,
+                host=unit_ip,
+                username="admin",
+                password=default_admin_password,
+                is_admin=True,
             )
-        return clients
+            for unit_ip in await self.get_unit_ips()
+        )
 
     async def wait_for_wordpress_idle(self, status: Optional[str] = None):
         """Wait for the wordpress application is idle."""
@@ -620,51 +695,160 @@ class WordpressApp:
         """Get units of the wordpress application."""
         return self.app.units
 
-    async def get_wordpress_config(self) -> str:
-        """Get wp-config.php contents from the leader unit.
+    def _exec_in_wordpress_container(self, command: List[str]) -> str:
+        """Run a command in the wordpress container of the first unit through the Kubernetes API.
+
+        Args:
+            command: Command to run.
 
         Returns:
-            The contents of wp-config.php
+            The output of the command.
         """
         unit = self.app.units[0]
-        stdout = kubernetes.stream.stream(
+        return kubernetes.stream.stream(
             self.kube_core_client.connect_get_namespaced_pod_exec,
             unit.name.replace("/", "-"),
             unit.model.name,
             container="wordpress",
-            command=["cat", "/var/www/html/wp-config.php"],
+            command=command,
             stderr=True,
             stdin=False,
             stdout=True,
             tty=False,
         )
-        return stdout
+
+    async def get_wordpress_config(self) -> str:
+        """Get wp-config.php contents from the leader unit.
+
+        Returns:
+            The contents of wp-config.php
+        """
+        return self._exec_in_wordpress_container(["cat", "/var/www/html/wp-config.php"])
+
+    async def get_uploads_owner(self) -> str:
+        """Get the owner uid of the uploads directory from the first unit.
+
+        Returns:
+            The uid of the uploads directory owner.
+        """
+        return self._exec_in_wordpress_container(
+            ["stat", "--printf=%u", "/var/www/html/wp-content/uploads"]
+        )
 
 
 async def wait_for(
     func: Callable[[], Union[Awaitable, Any]],
     timeout: int = 300,
-    check_interval: int = 10,
+    check_interval: float = 10,
+    max_interval: Optional[float] = None,
 ) -> Any:
     """Wait for function execution to become truthy.
 
+    A synchronous callback runs in the default executor, so it does not block the event loop while
+    it waits on I/O.
+
     Args:
         func: A callback function to wait to return a truthy value.
         timeout: Time in seconds to wait for function result to become truthy.
-        check_interval: Time in seconds to wait between ready checks.
+        check_interval: Time in seconds to wait between ready checks, or before the first retry
+            if max_interval is given.
+        max_interval: If given, the time between ready checks doubles after every failed check,
+            with some jitter, up to this number of seconds.
 
     Raises:
         TimeoutError: if the callback function did not return a truthy value within timeout.
     """
-    deadline = time.time() + timeout
+    loop = asyncio.get_running_loop()
+    deadline = time.monotonic() + timeout
     is_awaitable = inspect.iscoroutinefunction(func)
-    while time.time() < deadline:
-        if is_awaitable and (result := await func()):
-            return result
-        if result := func():
+    # log the check by name only, the repr of a partial includes its arguments, e.g. credentials
+    func_name = getattr(getattr(func, "func", func), "__qualname__", type(func).__name__)
+    interval = check_interval
+    while True:
+        result = await func() if is_awaitable else await loop.run_in_executor(None, func)
+        if result:
             return result
-        time.sleep(check_interval)
-    raise TimeoutError()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError()
+        if max_interval is None:
+            sleep = check_interval
+        else:
+            sleep = min(interval * _JITTER.uniform(0.8, 1.2), max_interval)
+            interval = min(interval * 2, max_interval)
+            logger.info("Check %s not ready, retrying in %.1f seconds", func_name, sleep)
+        await asyncio.sleep(min(sleep, remaining))
+
+
+async def gather_in_executor(
+    calls: Iterable[Callable[[], T]], max_concurrency: int = 16
+) -> List[T]:
+    """Run blocking callables concurrently in the default executor.
+
+    Args:
+        calls: Callables without arguments to run, e.g. blocking HTTP requests.
+        max_concurrency: Maximum number of callables running at the same time.
+
+    Returns:
+        The results of the callables, in the same order as the callables.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(call: Callable[[], T]) -> T:
+        """Run the callable in the executor once the semaphore is acquired.
+
+        Args:
+            call: Callable to run.
+
+        Returns:
+            The result of the callable.
+        """
+        async with semaphore:
+            return await loop.run_in_executor(None, call)
+
+    return list(await asyncio.gather(*(run(call) for call in calls)))
+
+
+async def wait_until(model: Model, predicate: Callable[[], bool], timeout: int = 600) -> None:
+    """Wait until the predicate over the model's watcher-updated state becomes truthy.
+
+    Unlike :meth:`juju.model.Model.wait_for_idle`, this returns as soon as the predicate holds,
+    without waiting for an idle period. The predicate must therefore only match a settled state.
+    The predicate only reads the local model state, so checking it often costs no API call.
+
+    Args:
+        model: The juju model whose state the predicate inspects.
+        predicate: A callback function returning True once the desired state is reached.
+        timeout: Time in seconds to wait for the predicate to become truthy.
+    """
+    await model.block_until(predicate, timeout=timeout, wait_period=0.5)
+
+
+async def wait_for_apps_idle(model: Model, apps: Iterable[str], **kwargs: Any) -> None:
+    """Wait for each application to become idle, with one concurrent wait per application.
+
+    Args:
+        model: The juju model the applications are deployed in.
+        apps: Names of the applications to wait for.
+        kwargs: Other keyword arguments passed to :meth:`juju.model.Model.wait_for_idle`.
+    """
+    await asyncio.gather(*(model.wait_for_idle(apps=[app], **kwargs) for app in apps))
+
+
+def all_units_active(model: Model) -> bool:
+    """Check if every unit in the model is active and its agent idle.
+
+    Args:
+        model: The juju model to check.
+
+    Returns:
+        True if the model has units and all of them are active and idle.
+    """
+    units = [unit for app in model.applications.values() for unit in app.units]
+    return bool(units) and all(
+        unit.workload_status == "active" and unit.agent_status == "idle" for unit in units
+    )
 
 
 async def get_mysql_primary_unit(units: Iterable[Unit]) -> Optional[Unit]:
@@ -3,43 +3,89 @@
 
 """Integration tests for WordPress charm COS addon management."""
 
-
-from typing import List, Set
+import asyncio
+import contextlib
+import functools
+from typing import Dict, List, Set
 
 import pytest
 
 from charm import WordpressCharm
-from tests.integration.helper import WordpressApp
+from tests.integration.helper import (
+    WordpressApp,
+    WordpressClient,
+    gather_in_executor,
+    wait_until,
+)
+
+_DEFAULT_THEMES = frozenset(WordpressCharm._WORDPRESS_DEFAULT_THEMES)
+_DEFAULT_PLUGINS = frozenset(WordpressCharm._WORDPRESS_DEFAULT_PLUGINS)
+
+
+def _units_blocked(wordpress: WordpressApp, reason: str) -> bool:
+    """Check if every wordpress unit is blocked with the reason in its status message.
+
+    Args:
+        wordpress: The wordpress application.
+        reason: Text expected in the status message.
+
+    Returns:
+        True if the application has units and all of them are blocked for the reason.
+    """
+    units = wordpress.get_units()
+    return bool(units) and all(
+        unit.workload_status == "blocked" and reason in unit.workload_status_message
+        for unit in units
+    )
 
 
+@pytest.mark.xdist_group("addon-themes")
 @pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
-async def test_wordpress_install_uninstall_themes(wordpress: WordpressApp):
+@pytest.mark.parametrize(
+    "theme_change_list",
+    [
+        pytest.param(
+            [{"twentyfifteen", "classic", "tt1-blocks", "twentyeleven"}, set()],
+            id="install-all-uninstall-all",
+        ),
+        pytest.param(
+            [
+                {"twentyfifteen", "classic"},
+                {"tt1-blocks", "twentyfifteen"},
+                {"tt1-blocks"},
+                {"twentyeleven"},
+                set(),
+            ],
+            id="incremental",
+            marks=pytest.mark.slow,
+        ),
+    ],
+)
+async def test_wordpress_install_uninstall_themes(
+    wordpress: WordpressApp,
+    wp_clients: Dict[str, WordpressClient],
+    theme_change_list: List[Set[str]],
+):
     """
     arrange: after WordPress charm has been deployed and db relation established.
     act: change themes setting in config.
     assert: themes should be installed and uninstalled accordingly.
     """
-    theme_change_list: List[Set[str]] = [
-        {"twentyfifteen", "classic"},
-        {"tt1-blocks", "twentyfifteen"},
-        {"tt1-blocks"},
-        {"twentyeleven"},
-        set(),
-    ]
     for themes in theme_change_list:
         await wordpress.set_config({"themes": ",".join(themes)})
-        await wordpress.model.wait_for_idle(status="active", apps=[wordpress.name])
-
-        for wordpress_client in await wordpress.client_for_units():
-            expected_themes = themes
-            expected_themes.update(WordpressCharm._WORDPRESS_DEFAULT_THEMES)
-            actual_themes = set(wordpress_client.list_themes())
-            assert (
-                expected_themes == actual_themes
+        await wordpress.wait_for_wordpress_idle(status="active")
+
+        expected_themes = themes | _DEFAULT_THEMES
+        for actual_themes in await gather_in_executor(
+            wordpress_client.list_themes for wordpress_client in wp_clients.values()
+        ):
+            assert expected_themes == set(
+                actual_themes
             ), f"theme installed {themes} should match themes setting in config"
 
 
-@pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
+@pytest.mark.xdist_group("addon-themes")
+@pytest.mark.usefixtures("prepare_mysql", "prepare_swift", "restore_config")
 async def test_wordpress_theme_installation_error(wordpress: WordpressApp):
     """
     arrange: after WordPress charm has been deployed and db relation established.
@@ -49,7 +95,11 @@ async def test_wordpress_theme_installation_error(wordpress: WordpressApp):
     """
     invalid_theme = "invalid-theme-sgkeahrgalejr"
     await wordpress.set_config({"themes": invalid_theme})
-    await wordpress.wait_for_wordpress_idle()
+    # a failed wait is reported by the assertions below
+    with contextlib.suppress(asyncio.TimeoutError):
+        await wait_until(
+            wordpress.model, functools.partial(_units_blocked, wordpress, invalid_theme)
+        )
 
     for unit in wordpress.get_units():
         assert (
@@ -60,37 +110,53 @@ async def test_wordpress_theme_installation_error(wordpress: WordpressApp):
             invalid_theme in unit.workload_status_message
         ), "status message should contain the reason why it's blocked"
 
-    await wordpress.set_config({"themes": ""})
-    await wordpress.wait_for_wordpress_idle(status="active")
-
 
+@pytest.mark.xdist_group("addon-plugins")
 @pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
-async def test_wordpress_install_uninstall_plugins(wordpress: WordpressApp):
+@pytest.mark.parametrize(
+    "plugin_change_list",
+    [
+        pytest.param(
+            [{"classic-editor", "classic-widgets"}, set()],
+            id="install-all-uninstall-all",
+        ),
+        pytest.param(
+            [
+                {"classic-editor", "classic-widgets"},
+                {"classic-editor"},
+                {"classic-widgets"},
+                set(),
+            ],
+            id="incremental",
+            marks=pytest.mark.slow,
+        ),
+    ],
+)
+async def test_wordpress_install_uninstall_plugins(
+    wordpress: WordpressApp,
+    wp_clients: Dict[str, WordpressClient],
+    plugin_change_list: List[Set[str]],
+):
     """
     arrange: after WordPress charm has been deployed and db relation established.
     act: change plugins setting in config.
     assert: plugins should be installed and uninstalled accordingly.
     """
-    plugin_change_list: List[Set[str]] = [
-        {"classic-editor", "classic-widgets"},
-        {"classic-editor"},
-        {"classic-widgets"},
-        set(),
-    ]
     for plugins in plugin_change_list:
         await wordpress.set_config({"plugins": ",".join(plugins)})
         await wordpress.wait_for_wordpress_idle(status="active")
 
-        for wordpress_client in await wordpress.client_for_units():
-            expected_plugins = plugins
-            expected_plugins.update(WordpressCharm._WORDPRESS_DEFAULT_PLUGINS)
-            actual_plugins = set(wordpress_client.list_plugins())
-            assert (
-                expected_plugins == actual_plugins
+        expected_plugins = plugins | _DEFAULT_PLUGINS
+        for actual_plugins in await gather_in_executor(
+            wordpress_client.list_plugins for wordpress_client in wp_clients.values()
+        ):
+            assert expected_plugins == set(
+                actual_plugins
             ), f"plugin installed {plugins} should match plugins setting in config"
 
 
-@pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
+@pytest.mark.xdist_group("addon-plugins")
+@pytest.mark.usefixtures("prepare_mysql", "prepare_swift", "restore_config")
 async def test_wordpress_plugin_installation_error(wordpress: WordpressApp):
     """
     arrange: after WordPress charm has been deployed and db relation established.
@@ -100,7 +166,11 @@ async def test_wordpress_plugin_installation_error(wordpress: WordpressApp):
     """
     invalid_plugin = "invalid-plugin-sgkeahrgalejr"
     await wordpress.set_config({"plugins": invalid_plugin})
-    await wordpress.wait_for_wordpress_idle()
+    # a failed wait is reported by the assertions below
+    with contextlib.suppress(asyncio.TimeoutError):
+        await wait_until(
+            wordpress.model, functools.partial(_units_blocked, wordpress, invalid_plugin)
+        )
 
     for unit in wordpress.get_units():
         assert (
@@ -110,6 +180,3 @@ async def test_wordpress_plugin_installation_error(wordpress: WordpressApp):
         assert (
             invalid_plugin in unit.workload_status_message
         ), "status message should contain the reason why it's blocked"
-
-    await wordpress.set_config({"plugins": ""})
-    await wordpress.wait_for_wordpress_idle(status="active")
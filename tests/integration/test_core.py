@@ -3,51 +3,146 @@
 
 """Integration tests for WordPress charm core functionality."""
 
+import functools
+import hashlib
 import io
 import json
 import secrets
 import urllib.parse
+from typing import Dict, List, Set, Tuple
 
 import PIL.Image
 import pytest
-import requests
 from pytest_operator.plugin import OpsTest
 
-from tests.integration.helper import WordpressApp, WordpressClient
+from tests.integration.helper import (
+    ThreadLocalSession,
+    WordpressApp,
+    WordpressClient,
+    all_units_active,
+    gather_in_executor,
+    wait_until,
+)
+
+# JPEG comment (COM) segment inserted right after the start of image (SOI) marker, its 4-byte
+# payload is overwritten per upload to make each image unique without re-encoding it.
+_JPEG_SOI = b"\xff\xd8"
+_JPEG_COM_HEADER = b"\xff\xfe\x00\x06"
+_JPEG_SOI_END = len(_JPEG_SOI)
+_MARKER_OFFSET = _JPEG_SOI_END + len(_JPEG_COM_HEADER)
+_MARKER_END = _MARKER_OFFSET + 4
+
+
+def _encode_once(size: Tuple[int, int]) -> bytes:
+    """Encode a JPEG image with an empty 4-byte comment segment after the SOI marker.
+
+    Args:
+        size: Width and height of the image.
+
+    Returns:
+        The JPEG image bytes.
+    """
+    image_buf = io.BytesIO()
+    PIL.Image.new("RGB", size, color=(0, 0, 0)).save(image_buf, format="jpeg")
+    jpeg = image_buf.getvalue()
+    return _JPEG_SOI + _JPEG_COM_HEADER + bytes(4) + jpeg[_JPEG_SOI_END:]
+
+
+_BASE_JPEG = _encode_once((500, 500))
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _stamp_jpeg(marker: int) -> bytes:
+    """Make a unique JPEG image by writing the marker into the base image comment segment.
+
+    Args:
+        marker: Integer written into the 4-byte comment payload.
+
+    Returns:
+        The JPEG image bytes.
+    """
+    return _BASE_JPEG[:_MARKER_OFFSET] + marker.to_bytes(4, "big") + _BASE_JPEG[_MARKER_END:]
+
+
+def _probe_status_code(session: ThreadLocalSession, url: str) -> int:
+    """Get the HTTP status code of the URL without downloading the response body.
+
+    Args:
+        session: Requests session to send the request with.
+        url: URL to probe.
+
+    Returns:
+        The HTTP status code of the response.
+    """
+    response = session.head(url, timeout=10, allow_redirects=True)
+    if response.status_code != 405:
+        return response.status_code
+    with session.get(url, timeout=10, stream=True) as response:
+        return response.status_code
+
+
+def _download_digest(session: ThreadLocalSession, url: str) -> str:
+    """Stream the URL content into a SHA-256 digest without holding the whole body in memory.
+
+    Args:
+        session: Requests session to send the request with.
+        url: URL to download.
+
+    Returns:
+        The hex SHA-256 digest of the response body.
+    """
+    digest = hashlib.sha256()
+    with session.get(url, timeout=10, stream=True) as response:
+        for chunk in response.iter_content(_DOWNLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _replace_url_host(url: str, host: str) -> str:
+    """Replace the host of the URL.
+
+    Args:
+        url: URL to update.
+        host: New host of the URL.
+
+    Returns:
+        The URL pointing to the new host.
+    """
+    return urllib.parse.urlsplit(url)._replace(netloc=host).geturl()
 
 
 @pytest.mark.usefixtures("prepare_mysql")
 @pytest.mark.abort_on_fail
-async def test_wordpress_up(wordpress: WordpressApp, ops_test: OpsTest):
+async def test_wordpress_up(wordpress: WordpressApp, ops_test: OpsTest, http: ThreadLocalSession):
     """
     arrange: after WordPress charm has been deployed and db relation established.
     act: test wordpress server is up.
     assert: wordpress service is up.
     """
-    await wordpress.model.wait_for_idle(status="active")
-    for unit_ip in await wordpress.get_unit_ips():
-        assert requests.get(f"http://{unit_ip}", timeout=10).status_code == 200
+    await wait_until(wordpress.model, functools.partial(all_units_active, wordpress.model))
+    status_codes = await gather_in_executor(
+        functools.partial(_probe_status_code, http, f"http://{unit_ip}")
+        for unit_ip in await wordpress.get_unit_ips()
+    )
+    assert all(status_code == 200 for status_code in status_codes)
 
 
 @pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
-async def test_wordpress_functionality(wordpress: WordpressApp):
+async def test_wordpress_functionality(wp_clients: Dict[str, WordpressClient]):
     """
     arrange: after WordPress charm has been deployed and db relation established.
     act: test WordPress basic functionality (login, post, comment).
     assert: WordPress works normally as a blog site.
     """
-    for unit_ip in await wordpress.get_unit_ips():
-        WordpressClient.run_wordpress_functionality_test(
-            host=unit_ip,
-            admin_username="admin",
-            admin_password=await wordpress.get_default_admin_password(),
-        )
+    await gather_in_executor(wp_client.run_functionality_test for wp_client in wp_clients.values())
 
 
 @pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
 async def test_openstack_object_storage_plugin(
     wordpress: WordpressApp,
     swift_conn,
+    http: ThreadLocalSession,
+    wp_clients: Dict[str, WordpressClient],
 ):
     """
     arrange: after charm deployed, db relation established and openstack swift server ready.
@@ -58,38 +153,55 @@ async def test_openstack_object_storage_plugin(
         WordPress media uploader should be accessible from all units.
     """
     container = await wordpress.get_swift_bucket()
-    for idx, unit_ip in enumerate(await wordpress.get_unit_ips()):
-        image = PIL.Image.new("RGB", (500, 500), color=(idx, 0, 0))
+    nonces: Set[str] = set()
+    uploads: List[Tuple[bytes, List[str]]] = []
+    unit_ips = await wordpress.get_unit_ips()
+    images = [_stamp_jpeg(idx) for idx in range(len(unit_ips))]
+    for idx, (unit_ip, image) in enumerate(zip(unit_ips, images)):
         nonce = secrets.token_hex(8)
         filename = f"{nonce}.{unit_ip}.{idx}.jpg"
-        image_buf = io.BytesIO()
-        image.save(image_buf, format="jpeg")
-        image = image_buf.getvalue()
-        wordpress_client = WordpressClient(
-            host=unit_ip,
-            username="admin",
-            password=await wordpress.get_default_admin_password(),
-            is_admin=True,
-        )
-        image_urls = wordpress_client.upload_media(filename=filename, content=image)["urls"]
-        swift_object_list = [
-            o["name"] for o in swift_conn.get_container(container, full_listing=True)[1]
-        ]
-        assert any(
-            nonce in f for f in swift_object_list
-        ), "media files uploaded should be stored in swift object storage"
-        source_url = min(image_urls, key=len)
-        for image_url in image_urls:
-            assert (
-                requests.get(image_url, timeout=10).status_code == 200
-            ), "the original image and resized images should be accessible from the WordPress site"
-        for host in await wordpress.get_unit_ips():
-            url_components = list(urllib.parse.urlsplit(source_url))
-            url_components[1] = host
-            url = urllib.parse.urlunsplit(url_components)
-            assert (
-                requests.get(url, timeout=10).content == image
-            ), "image downloaded from WordPress should match the image uploaded"
+        image_urls = wp_clients[unit_ip].upload_media(filename=filename, content=image)["urls"]
+        nonces.add(nonce)
+        uploads.append((image, image_urls))
+    # uploaded object names are <object-prefix>/<year>/<month>/<nonce>.<unit_ip>.<idx>[-WxH].jpg
+    swift_object_nonces = {
+        o["name"].rsplit("/", 1)[-1].split(".", 1)[0]
+        for o in swift_conn.get_container(container, full_listing=True)[1]
+    }
+    assert (
+        nonces <= swift_object_nonces
+    ), "media files uploaded should be stored in swift object storage"
+    uploaded_urls = [image_url for _, image_urls in uploads for image_url in image_urls]
+    image_responses = await gather_in_executor(
+        functools.partial(http.head, image_url, timeout=10, allow_redirects=True)
+        for image_url in uploaded_urls
+    )
+    inaccessible_urls = [
+        image_url
+        for image_url, response in zip(uploaded_urls, image_responses)
+        if response.status_code != 200
+    ]
+    assert not inaccessible_urls, (
+        "the original image and resized images should be accessible from the WordPress site, "
+        f"inaccessible: {inaccessible_urls}"
+    )
+    downloads = [
+        (hashlib.sha256(image).hexdigest(), _replace_url_host(min(image_urls, key=len), host))
+        for image, image_urls in uploads
+        for host in unit_ips
+    ]
+    download_digests = await gather_in_executor(
+        functools.partial(_download_digest, http, url) for _, url in downloads
+    )
+    mismatched_urls = [
+        url
+        for (image_digest, url), download_digest in zip(downloads, download_digests)
+        if download_digest != image_digest
+    ]
+    assert not mismatched_urls, (
+        "image downloaded from WordPress should match the image uploaded, "
+        f"mismatched: {mismatched_urls}"
+    )
 
 
 @pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
@@ -103,28 +215,23 @@ async def test_apache_config(wordpress: WordpressApp, ops_test: OpsTest):
         {"initial_settings": json.dumps({"user_name": "foo", "admin_email": "bar@example.com"})}
     )
     await wordpress.wait_for_wordpress_idle()
-    exit_code, stdout, _ = await ops_test.juju("debug-log", "--replay")
+    # only replay the logs of the wordpress units instead of the whole model
+    include_units = (
+        arg
+        for unit in wordpress.get_units()
+        for arg in ("--include", f"unit-{unit.name.replace('/', '-')}")
+    )
+    exit_code, stdout, _ = await ops_test.juju("debug-log", "--replay", *include_units)
     assert exit_code == 0
     assert "Apache config docker-php-swift-proxy is enabled" in stdout
     assert "Conf docker-php-swift-proxy already enabled" not in stdout
 
 
 @pytest.mark.usefixtures("prepare_mysql")
-async def test_uploads_owner(wordpress: WordpressApp, ops_test: OpsTest):
+async def test_uploads_owner(wordpress: WordpressApp):
     """
     arrange: after WordPress charm has been deployed and db relation established.
     act: get uploads directory owner
     assert: uploads belongs to wordpress user.
     """
-    cmd = [
-        "juju",
-        "ssh",
-        f"{wordpress.app.name}/0",
-        "stat",
-        '--printf="%u"',
-        "/var/www/html/wp-content/uploads",
-    ]
-
-    retcode, stdout, _ = await ops_test.run(*cmd)
-    assert retcode == 0
-    assert "584792" == stdout.strip()
+    assert "584792" == (await wordpress.get_uploads_owner()).strip()
@@ -4,22 +4,48 @@
 # pylint: disable=protected-access,too-many-locals
 
 """Integration tests for WordPress charm COS integration."""
+import asyncio
 import fnmatch
 import functools
-from typing import Iterable
+import time
+from typing import Dict, Iterable, Set, Tuple
 
 import kubernetes
 import pytest
-import requests
 from juju.client._definitions import FullStatus
 
-from tests.integration.helper import WordpressApp, wait_for
+from tests.integration.helper import ThreadLocalSession, WordpressApp, wait_for
 
+# Log filenames seen in the Loki series per (Loki unit address, application name), with the time
+# they were fetched. The series only change when a new log file appears, so while all expected
+# files are known only the log query is polled.
+_SERIES_CACHE: Dict[Tuple[str, str], Tuple[float, Set[str]]] = {}
+_SERIES_CACHE_TTL = 30
 
-def log_files_exist(unit_address: str, application_name: str, filenames: Iterable[str]) -> bool:
+
+def _all_matched(log_files: Set[str], patterns: Iterable[str]) -> bool:
+    """Check that every filename pattern matches at least one log file.
+
+    Args:
+        log_files: Log filenames known to Loki.
+        patterns: Expected filename patterns.
+
+    Returns:
+        True if every pattern matches a log file.
+    """
+    return all(fnmatch.filter(log_files, pattern) for pattern in patterns)
+
+
+def log_files_exist(
+    session: ThreadLocalSession,
+    unit_address: str,
+    application_name: str,
+    filenames: Iterable[str],
+) -> bool:
     """Returns whether log filenames exist in Loki logs query.
 
     Args:
+        session: Requests session to query Loki with.
         unit_address: Loki unit ip address.
         application_name: Application name to query logs for.
         filenames: Expected filenames to be present in logs collected by Loki.
@@ -27,11 +53,17 @@ def log_files_exist(unit_address: str, application_name: str, filenames: Iterabl
     Returns:
         True if log files with logs exists. False otherwise.
     """
-    series = requests.get(f"http://{unit_address}:3100/loki/api/v1/series", timeout=10).json()
-    log_files = set(series_data["filename"] for series_data in series["data"])
-    if not all(any(fnmatch.fnmatch(file, pattern) for file in log_files) for pattern in filenames):
-        return False
-    log_query = requests.get(
+    cache_key = (unit_address, application_name)
+    cached_at, log_files = _SERIES_CACHE.get(cache_key, (0.0, set()))
+    if time.monotonic() - cached_at > _SERIES_CACHE_TTL:
+        log_files = set()
+    if not _all_matched(log_files, filenames):
+        series = session.get(f"http://{unit_address}:3100/loki/api/v1/series", timeout=10).json()
+        log_files = log_files | {series_data["filename"] for series_data in series["data"]}
+        _SERIES_CACHE[cache_key] = (time.monotonic(), log_files)
+        if not _all_matched(log_files, filenames):
+            return False
+    log_query = session.get(
         f"http://{unit_address}:3100/loki/api/v1/query",
         timeout=10,
         params={"query": f'{{juju_application="{application_name}"}}'},
@@ -41,10 +73,11 @@ def log_files_exist(unit_address: str, application_name: str, filenames: Iterabl
 
 
 @pytest.mark.abort_on_fail
-@pytest.mark.usefixtures("prepare_mysql", "prepare_loki")
+@pytest.mark.usefixtures("prepare_loki", "prepare_mysql")
 async def test_loki_integration(
     wordpress: WordpressApp,
-    kube_config: str,
+    kube_core_client: kubernetes.client.CoreV1Api,
+    http: ThreadLocalSession,
 ):
     """
     arrange: after WordPress charm has been deployed and relations established.
@@ -53,20 +86,27 @@ async def test_loki_integration(
         loki to scrape.
     """
     status: FullStatus = await wordpress.model.get_status(filters=["loki-k8s"])
-    for unit in status.applications["loki-k8s"].units.values():
-        await wait_for(
-            functools.partial(
-                log_files_exist,
-                unit.address,
-                wordpress.name,
-                ("/var/log/apache2/error.*.log", "/var/log/apache2/access.*.log"),
-            ),
-            timeout=10 * 60,
+    await asyncio.gather(
+        *(
+            wait_for(
+                functools.partial(
+                    log_files_exist,
+                    http,
+                    unit.address,
+                    wordpress.name,
+                    ("/var/log/apache2/error.*.log", "/var/log/apache2/access.*.log"),
+                ),
+                timeout=10 * 60,
+                check_interval=1,
+                max_interval=60,
+            )
+            for unit in status.applications["loki-k8s"].units.values()
         )
-    kubernetes.config.load_kube_config(config_file=kube_config)
-    kube_core_client = kubernetes.client.CoreV1Api()
-
+    )
     kube_log = kube_core_client.read_namespaced_pod_log(
-        name=f"{wordpress.name}-0", namespace=wordpress.model.name, container="wordpress"
+        name=f"{wordpress.name}-0",
+        namespace=wordpress.model.name,
+        container="wordpress",
+        tail_lines=1,
     )
     assert kube_log
@@ -5,18 +5,21 @@
 
 """Integration tests for WordPress charm COS integration."""
 
+import asyncio
+import functools
+
 import pytest
-import requests
 from juju.client._definitions import FullStatus
 
 from cos import APACHE_PROMETHEUS_SCRAPE_PORT
-from tests.integration.helper import WordpressApp
+from tests.integration.helper import ThreadLocalSession, WordpressApp, gather_in_executor
 
 
 @pytest.mark.abort_on_fail
-@pytest.mark.usefixtures("prepare_mysql", "prepare_prometheus")
+@pytest.mark.usefixtures("prepare_prometheus", "prepare_mysql")
 async def test_prometheus_integration(
     wordpress: WordpressApp,
+    http: ThreadLocalSession,
 ):
     """
     arrange: none.
@@ -24,12 +27,21 @@ async def test_prometheus_integration(
     assert: prometheus metrics endpoint for prometheus is active and prometheus has active scrape
         targets.
     """
-    for unit_ip in await wordpress.get_unit_ips():
-        res = requests.get(f"http://{unit_ip}:{APACHE_PROMETHEUS_SCRAPE_PORT}", timeout=10)
-        assert res.status_code == 200
     status: FullStatus = await wordpress.model.get_status(filters=["prometheus-k8s"])
-    for unit in status.applications["prometheus-k8s"].units.values():
-        query_targets = requests.get(
-            f"http://{unit.address}:9090/api/v1/targets", timeout=10
-        ).json()
-        assert len(query_targets["data"]["activeTargets"])
+    unit_ips = await wordpress.get_unit_ips()
+    scrape_responses, target_responses = await asyncio.gather(
+        gather_in_executor(
+            functools.partial(
+                http.get, f"http://{unit_ip}:{APACHE_PROMETHEUS_SCRAPE_PORT}", timeout=10
+            )
+            for unit_ip in unit_ips
+        ),
+        gather_in_executor(
+            functools.partial(http.get, f"http://{unit.address}:9090/api/v1/targets", timeout=10)
+            for unit in status.applications["prometheus-k8s"].units.values()
+        ),
+    )
+    for res in scrape_responses:
+        assert res.status_code == 200
+    for res in target_responses:
+        assert len(res.json()["data"]["activeTargets"])
@@ -3,18 +3,23 @@
 
 """Integration tests for WordPress charm external service integration."""
 
+import functools
 import secrets
+from typing import Dict, List
 
 import pytest
 from pytest import Config
 
-from tests.integration.helper import WordpressApp, WordpressClient
+from tests.integration.helper import WordpressApp, WordpressClient, gather_in_executor
 
 
+@pytest.mark.xdist_group("external-akismet")
 @pytest.mark.requires_secret
+@pytest.mark.requires_options("--akismet-api-key")
 @pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
 async def test_akismet_plugin(
     wordpress: WordpressApp,
+    wp_clients: Dict[str, WordpressClient],
     pytestconfig: Config,
 ):
     """
@@ -23,13 +28,19 @@ async def test_akismet_plugin(
     assert: Akismet plugin should be activated and spam detection function should be working.
     """
     akismet_api_key = pytestconfig.getoption("--akismet-api-key")
-    if not akismet_api_key:
-        raise ValueError("--akismet-api-key is required for running this test")
 
     await wordpress.set_config({"wp_plugin_akismet_key": akismet_api_key})
     await wordpress.wait_for_wordpress_idle(status="active")
 
-    for wordpress_client in await wordpress.client_for_units():
+    def post_comments(wordpress_client: WordpressClient) -> List[str]:
+        """Post a spam and a normal comment to a new post on the WordPress unit.
+
+        Args:
+            wordpress_client: Client of the WordPress unit.
+
+        Returns:
+            Statuses of the comments attached to the new post.
+        """
         post = wordpress_client.create_post(secrets.token_hex(8), secrets.token_hex(8))
         wordpress_client.create_comment(
             post_id=post["id"], post_link=post["link"], content="akismet-guaranteed-spam"
@@ -37,15 +48,26 @@ async def test_akismet_plugin(
         wordpress_client.create_comment(
             post_id=post["id"], post_link=post["link"], content="test comment"
         )
+        return [
+            comment["status"]
+            for comment in wordpress_client.list_comments(status="any", post_id=post["id"])
+        ]
+
+    for comment_statuses in await gather_in_executor(
+        functools.partial(post_comments, wordpress_client)
+        for wordpress_client in wp_clients.values()
+    ):
         assert (
-            len(wordpress_client.list_comments(status="spam", post_id=post["id"])) == 1
+            comment_statuses.count("spam") == 1
         ), "Akismet plugin should move the triggered spam comment to the spam section"
         assert (
-            len(wordpress_client.list_comments(post_id=post["id"])) == 1
+            comment_statuses.count("approved") == 1
         ), "Akismet plugin should keep the normal comment"
 
 
+@pytest.mark.xdist_group("external-openid")
 @pytest.mark.requires_secret
+@pytest.mark.requires_options("--openid-username", "--openid-password", "--launchpad-team")
 @pytest.mark.usefixtures("prepare_mysql", "prepare_swift")
 async def test_openid_plugin(
     wordpress: WordpressApp,
@@ -57,29 +79,40 @@ async def test_openid_plugin(
     assert: A WordPress user should be created with correct roles according to the config.
     """
     openid_username = pytestconfig.getoption("--openid-username")
-    if not openid_username:
-        raise ValueError("--openid-username is required for running this test")
     openid_password = pytestconfig.getoption("--openid-password")
-    if not openid_password:
-        raise ValueError("--openid-password is required for running this test")
     launchpad_team = pytestconfig.getoption("--launchpad-team")
-    if not launchpad_team:
-        raise ValueError("--launchpad-team is required for running this test")
     await wordpress.set_config({"wp_plugin_openid_team_map": f"{launchpad_team}=administrator"})
     await wordpress.wait_for_wordpress_idle(status="active")
 
-    for idx, unit_ip in enumerate(await wordpress.get_unit_ips()):
-        # wordpress-teams-integration has a bug causing desired roles not to be assigned to
-        # the user when first-time login. Login twice by creating the WordPressClient client twice
-        # for the very first time.
-        for _ in range(2 if idx == 0 else 1):
-            wordpress_client = WordpressClient(
-                host=unit_ip,
-                username=openid_username,
-                password=openid_password,
-                is_admin=True,
-                use_launchpad_login=True,
-            )
+    def launchpad_login(unit_ip: str) -> WordpressClient:
+        """Log in the WordPress unit using the Launchpad OpenID account.
+
+        Args:
+            unit_ip: ip address of the WordPress unit.
+
+        Returns:
+            WordPress client logged in with the Launchpad OpenID account.
+        """
+        return WordpressClient(
+            host=unit_ip,
+            username=openid_username,
+            password=openid_password,
+            is_admin=True,
+            use_launchpad_login=True,
+        )
+
+    first_unit_ip, *other_unit_ips = await wordpress.get_unit_ips()
+    # wordpress-teams-integration has a bug causing desired roles not to be assigned to
+    # the user when first-time login. Login twice by creating the WordPressClient client twice
+    # for the very first time, the logins on the other units can then happen concurrently.
+    launchpad_login(first_unit_ip)
+    wordpress_clients = [launchpad_login(first_unit_ip)]
+    wordpress_clients.extend(
+        await gather_in_executor(
+            functools.partial(launchpad_login, unit_ip) for unit_ip in other_unit_ips
+        )
+    )
+    for wordpress_client in wordpress_clients:
         assert (
             "administrator" in wordpress_client.list_roles()
         ), "An launchpad OpenID account should be associated with the WordPress admin user"
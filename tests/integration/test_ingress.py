@@ -4,54 +4,22 @@
 """Integration tests for WordPress charm ingress integration."""
 
 import socket
-import unittest.mock
 
 import kubernetes
 import pytest
 import requests
 
-from tests.integration.helper import WordpressApp
+from tests.integration.helper import WordpressApp, wait_for_apps_idle
 
 
-@pytest.mark.usefixtures("prepare_mysql", "prepare_nginx_ingress", "prepare_swift")
-async def test_ingress(wordpress: WordpressApp):
+@pytest.mark.usefixtures("prepare_nginx_ingress", "prepare_mysql", "prepare_swift")
+async def test_ingress(wordpress: WordpressApp, monkeypatch: pytest.MonkeyPatch):
     """
     arrange: after WordPress charm has been deployed and db relation established.
     act: deploy the nginx-ingress-integrator charm and create the relation between ingress charm
         and WordPress charm.
     assert: A Kubernetes ingress should be created and the ingress should accept HTTPS connections.
     """
-
-    def gen_patch_getaddrinfo(host: str, resolve_to: str):
-        """Generate patched getaddrinfo function.
-
-        This function is used to generate a patched getaddrinfo function that will resolve to the
-        resolve_to address without having to actually register a host.
-
-        Args:
-            host: intended hostname of a given application.
-            resolve_to: destination address for host to resolve to.
-
-        Returns:
-            A patching function for getaddrinfo.
-        """
-        original_getaddrinfo = socket.getaddrinfo
-
-        def patched_getaddrinfo(*args):
-            """Patch getaddrinfo to point to desired ip address.
-
-            Args:
-                args: original arguments to getaddrinfo when creating network connection.
-
-            Returns:
-                Patched getaddrinfo function.
-            """
-            if args[0] == host:
-                return original_getaddrinfo(resolve_to, *args[1:])
-            return original_getaddrinfo(*args)
-
-        return patched_getaddrinfo
-
     response = requests.get("http://127.0.0.1", headers={"Host": wordpress.name}, timeout=5)
     assert (
         response.status_code == 200 and "wordpress" in response.text.lower()
@@ -59,20 +27,42 @@ async def test_ingress(wordpress: WordpressApp):
 
     new_hostname = "wordpress.test"
     await wordpress.set_config({"blog_hostname": new_hostname})
-    await wordpress.model.wait_for_idle(status="active")
-    with unittest.mock.patch.multiple(
-        socket, getaddrinfo=gen_patch_getaddrinfo(new_hostname, "127.0.0.1")
-    ):
+    # the ingress is only updated once the ingress charm has handled the relation change
+    await wait_for_apps_idle(
+        wordpress.model, [wordpress.name, "nginx-ingress-integrator"], status="active"
+    )
+    original_getaddrinfo = socket.getaddrinfo
+
+    def patched_getaddrinfo(host, port, *args, **kwargs):
+        """Resolve the new hostname to the ingress address without a DNS lookup.
+
+        Args:
+            host: hostname to resolve.
+            port: port of the connection.
+            args: other positional arguments to getaddrinfo.
+            kwargs: keyword arguments to getaddrinfo.
+
+        Returns:
+            getaddrinfo compatible address information.
+        """
+        if host == new_hostname:
+            return [
+                (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", ("127.0.0.1", port))
+            ]
+        return original_getaddrinfo(host, port, *args, **kwargs)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(socket, "getaddrinfo", patched_getaddrinfo)
         response = requests.get(f"https://{new_hostname}", timeout=5, verify=False)  # nosec
         assert (
             response.status_code == 200 and "wordpress" in response.text.lower()
         ), "Ingress should update the server name indication based routing after blog_hostname updated"
 
 
-@pytest.mark.usefixtures("prepare_mysql", "prepare_nginx_ingress", "prepare_swift")
+@pytest.mark.usefixtures("prepare_nginx_ingress", "prepare_mysql", "prepare_swift")
 async def test_ingress_modsecurity(
     wordpress: WordpressApp,
-    kube_config: str,
+    k8s_networking_v1: kubernetes.client.NetworkingV1Api,
 ):
     """
     arrange: WordPress charm is running and Nginx ingress integrator deployed and related to it.
@@ -81,10 +71,12 @@ async def test_ingress_modsecurity(
         for WordPress.
     """
     await wordpress.set_config({"use_nginx_ingress_modsec": "true"})
-    await wordpress.model.wait_for_idle(status="active")
+    # the ingress is only updated once the ingress charm has handled the relation change
+    await wait_for_apps_idle(
+        wordpress.model, [wordpress.name, "nginx-ingress-integrator"], status="active"
+    )
 
-    kubernetes.config.load_kube_config(config_file=kube_config)
-    kube = kubernetes.client.NetworkingV1Api()
+    kube = k8s_networking_v1
 
     def get_ingress_annotation():
         """Get ingress annotations from kubernetes.
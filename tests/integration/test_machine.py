@@ -6,7 +6,7 @@
 import functools
 
 import pytest
-from helper import get_mysql_primary_unit, wait_for
+from helper import all_units_active, get_mysql_primary_unit, wait_for, wait_until
 from juju.application import Application
 from juju.model import Model
 
@@ -23,16 +23,31 @@ async def test_database_endpoints_changed(machine_model: Model, wordpress: Wordp
     model: Model = wordpress.model
     mysql: Application = machine_model.applications["mysql"]
     await mysql.add_unit(2)
-    await machine_model.wait_for_idle(["mysql"], timeout=30 * 60)
+    await wait_until(
+        machine_model,
+        lambda: len(mysql.units) == 3 and all_units_active(machine_model),
+        timeout=30 * 60,
+    )
     await model.wait_for_idle(["wordpress-k8s"])
 
     leader = await get_mysql_primary_unit(mysql.units)
     assert leader, "No leader unit found."
     await mysql.destroy_unit(leader.name)
-    await machine_model.wait_for_idle(["mysql"], timeout=30 * 60, idle_period=30)
+    await wait_until(
+        machine_model,
+        lambda: len(mysql.units) == 2
+        and all_units_active(machine_model)
+        and any(unit.workload_status_message == "Primary" for unit in mysql.units),
+        timeout=30 * 60,
+    )
     await model.wait_for_idle(["wordpress-k8s"])
 
-    leader = await wait_for(functools.partial(get_mysql_primary_unit, mysql.units))
+    leader = await wait_for(
+        functools.partial(get_mysql_primary_unit, mysql.units),
+        timeout=30 * 60,
+        check_interval=0.1,
+        max_interval=5,
+    )
 
     assert (
         await leader.get_public_address() in await wordpress.get_wordpress_config()